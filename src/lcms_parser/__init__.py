@@ -2,7 +2,10 @@
 
 from lcms_parser.experimental.hits import HitIdentifier
 from lcms_parser.experimental.planner import ExpectedResults
-from lcms_parser.fileio.waters import WatersRawFile
+from lcms_parser.fileio.waters import (
+    WatersRawFile,
+    load_many,
+)
 from lcms_parser.helpers.helpers import (
     IonTraceMode,
     normalised,
@@ -27,6 +30,7 @@ __all__ = (
     "ExpectedResults",
     "HitIdentifier",
     "WatersRawFile",
+    "load_many",
     "IonTraceMode",
     "normalised",
     "MassPeak",
@@ -1,7 +1,11 @@
 """Modules to deal with raw instrument files."""
 
-from lcms_parser.fileio.waters import WatersRawFile
+from lcms_parser.fileio.waters import (
+    WatersRawFile,
+    load_many,
+)
 
 __all__ = [
     "WatersRawFile",
+    "load_many",
 ]
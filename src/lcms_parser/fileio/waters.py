@@ -4,10 +4,24 @@ Requires Waters Connect Python SDK.
 
 """
 
+import logging
+import os
+import tempfile
+import threading
+import zipfile
+from collections import OrderedDict
+from collections.abc import (
+    Iterable,
+    Sequence,
+)
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 from os import PathLike
 from pathlib import Path
-from typing import Optional
+from typing import (
+    Optional,
+    cast,
+)
 
 import numpy as np
 from masslynxsdk import (
@@ -17,6 +31,10 @@ from masslynxsdk import (
     MassLynxRawScanReader,
 )
 from masslynxsdk.MassLynxRawReader import MassLynxException
+from numpy.typing import (
+    DTypeLike,
+    NDArray,
+)
 
 from lcms_parser.experimental.hits import HitIdentifier
 from lcms_parser.helpers.helpers import IonTraceMode
@@ -24,14 +42,47 @@ from lcms_parser.msdata.spectrum import MassSpectrum
 from lcms_parser.traces.analog import AnalogTrace
 from lcms_parser.traces.ion import TICTrace
 
+logger = logging.getLogger(__name__)
+
+_license_lock = threading.Lock()
+
+# Bump when the layout of the on-disk trace cache changes.
+_TRACE_CACHE_VERSION = 2
+
+
+def _read_license_key() -> str:
+    """Read the license key from a local "license.key" file."""
+    with _license_lock:
+        with open(Path.cwd() / "license.key", "r") as f:
+            return f.read()
+
+
+def _same_mass_grid(
+    masses: NDArray[np.float64], reference: NDArray[np.float64]
+) -> bool:
+    """Check if two mass grids are identical."""
+    return masses.size == reference.size and np.array_equal(masses, reference)
+
+
+def _ion_mode_id(ion_mode) -> int:
+    """Get the number of a MassLynx ion mode (an enum member or an int)."""
+    return int(getattr(ion_mode, "value", ion_mode))
+
 
 class WatersRawFile(HitIdentifier):
-    """Raw MassLynx file and associated properties."""
+    """Raw MassLynx file and associated properties.
+
+    Instances are not thread-safe, but independent instances (e.g., created
+    by `load_many()`) can be used from different threads.
+
+    """
 
     def __init__(
         self,
         path: PathLike,
         license_key: Optional[str] = None,
+        scan_cache_size: int = 128,
+        cache_traces: bool = False,
     ):
         """Initialise MSFile.
 
@@ -44,39 +95,167 @@ class WatersRawFile(HitIdentifier):
             A license key from Waters. If None, the initialiser will try to
             retrieve the key from a local "license.key" file.
 
+        scan_cache_size, optional
+            Maximum number of mass spectra kept in memory for repeated
+            queries, by default 128.
+
+        cache_traces, optional
+            Store extracted traces in a ".parsed" directory next to the .RAW
+            file and reuse them when the file is opened again (unless the
+            .RAW file has changed since), by default False.
+
+        Raises
+        ------
+        MassLynxException
+            If the MassLynx license is invalid.
+        OSError
+            If the license file cannot be read.
+
         """
+        self._path = str(path)
+        self._cache_dir = (
+            Path(path).with_suffix(".parsed") if cache_traces else None
+        )
         try:
             if license_key is not None:
                 self._license_key = license_key
             else:
-                with open(Path.cwd() / "license.key", "r") as f:
-                    self._license_key = f.read()
+                self._license_key = _read_license_key()
 
             self._info_reader = MassLynxRawInfoReader(
-                str(path), self._license_key
+                self._path, self._license_key
             )
             self._analog_reader = MassLynxRawAnalogReader(
-                str(path), self._license_key
+                self._path, self._license_key
             )
-            self._chromatogram_reader = MassLynxRawChromatogramReader(
-                str(path), self._license_key
-            )
-            self._scan_reader = MassLynxRawScanReader(
-                str(path), self._license_key
-            )
-            self._trace_function_lookup = self.get_chromatogram_ids()
 
         except MassLynxException:
-            print("MassLynx license is invalid.")
+            logger.error("MassLynx license is invalid.")
+            raise
 
         except OSError as e:
-            print(f"Unable to open the license file:\n    {e}")
+            logger.error("Unable to open the license file:\n    %s", e)
+            raise
 
         except Exception as e:
-            print(f"Cannot load the .RAW file: {e}.")
+            logger.error("Cannot load the .RAW file: %s.", e)
+            raise
 
         self.ms_traces: dict[IonTraceMode, TICTrace] = {}
-        self.analog_traces: dict[int, AnalogTrace] = {}
+        self.analog_traces: dict[tuple[int, bool, np.dtype], AnalogTrace] = {}
+        self._scan_cache: OrderedDict[
+            tuple[int, IonTraceMode, int],
+            tuple[NDArray[np.float64], NDArray[np.float64]],
+        ] = OrderedDict()
+        self._scan_cache_size = scan_cache_size
+        self._masses_cache: dict[int, NDArray[np.float64]] = {}
+
+        # Readers and lookups opened or built on first use. Plain attributes
+        # are used rather than `functools.cached_property`, which (before
+        # Python 3.12) serialises the first access across all instances.
+        self.__chromatogram_reader: Optional[MassLynxRawChromatogramReader] = (
+            None
+        )
+        self.__scan_reader: Optional[MassLynxRawScanReader] = None
+        self.__ion_modes: Optional[list] = None
+        self.__ion_mode_functions: Optional[dict[int, int]] = None
+        self.__ion_mode_names: Optional[dict[int, IonTraceMode]] = None
+        self.__ion_mode_ids: Optional[dict[IonTraceMode, int]] = None
+
+    @property
+    def _chromatogram_reader(self) -> MassLynxRawChromatogramReader:
+        """Chromatogram reader, opened on first use."""
+        if self.__chromatogram_reader is None:
+            self.__chromatogram_reader = MassLynxRawChromatogramReader(
+                self._path, self._license_key
+            )
+        return self.__chromatogram_reader
+
+    @property
+    def _scan_reader(self) -> MassLynxRawScanReader:
+        """Scan reader, opened on first use."""
+        if self.__scan_reader is None:
+            self.__scan_reader = MassLynxRawScanReader(
+                self._path, self._license_key
+            )
+        return self.__scan_reader
+
+    @property
+    def _ion_modes(self) -> list:
+        """MassLynx ion mode of every function, read on first use.
+
+        Functions (electrospray TIC or DAD) are numbered in .RAW. Need to
+        identify which number corresponds to the trace.
+
+        """
+        if self.__ion_modes is None:
+            num_functions = self._info_reader.GetNumberofFunctions()
+            self.__ion_modes = [
+                self._info_reader.GetIonMode(func)
+                for func in range(num_functions)
+            ]
+        return self.__ion_modes
+
+    @property
+    def _ion_mode_functions(self) -> dict[int, int]:
+        """Lookup of function numbers by MassLynx ion mode number."""
+        if self.__ion_mode_functions is None:
+            self.__ion_mode_functions = {
+                _ion_mode_id(ion_mode): func
+                for func, ion_mode in enumerate(self._ion_modes)
+            }
+        return self.__ion_mode_functions
+
+    @property
+    def _ion_mode_names(self) -> dict[int, IonTraceMode]:
+        """Names of the MassLynx ion mode numbers (e.g., ES+)."""
+        if self.__ion_mode_names is None:
+            names: dict[int, IonTraceMode] = {}
+            for ion_mode in self._ion_modes:
+                if _ion_mode_id(ion_mode) not in names:
+                    names[_ion_mode_id(ion_mode)] = cast(
+                        IonTraceMode,
+                        str(self._info_reader.GetIonModeString(ion_mode)),
+                    )
+            self.__ion_mode_names = names
+        return self.__ion_mode_names
+
+    @property
+    def _ion_mode_ids(self) -> dict[IonTraceMode, int]:
+        """MassLynx ion mode numbers by name."""
+        if self.__ion_mode_ids is None:
+            self.__ion_mode_ids = {
+                name: ion_mode
+                for ion_mode, name in self._ion_mode_names.items()
+            }
+        return self.__ion_mode_ids
+
+    def _resolve_ion_mode(
+        self,
+        mode: IonTraceMode | int,
+    ) -> tuple[IonTraceMode, int]:
+        """Get the name and the MassLynx number of an ion mode.
+
+        Parameters
+        ----------
+        mode
+            Ion mode name (see `IonTraceMode`) or MassLynx ion mode number.
+
+        Returns
+        -------
+            Name and MassLynx number of the ion mode.
+
+        Raises
+        ------
+        KeyError
+            If the file has no function with the ion mode.
+
+        """
+        if isinstance(mode, (int, np.integer)):
+            ion_mode = int(mode)
+            return self._ion_mode_names[ion_mode], ion_mode
+
+        return mode, self._ion_mode_ids[mode]
 
     def get_chromatogram_ids(self):
         """Get a lookup dictionary for function numbers of trace types.
@@ -92,18 +271,83 @@ class WatersRawFile(HitIdentifier):
             Lookup table: value(trace_type) = function_number.
 
         """
-        trace_function_lookup = {}
-        num_functions = self._info_reader.GetNumberofFunctions()
-        for func in range(num_functions):
-            # Functions (electrospray TIC or DAD) are numbered in .RAW.
-            # Need to identify which number corresponds to the trace.
-            trace = str(
-                self._info_reader.GetIonModeString(
-                    self._info_reader.GetIonMode(func)
+        return {
+            self._ion_mode_names[ion_mode]: func
+            for ion_mode, func in self._ion_mode_functions.items()
+        }
+
+    def _load_cached_trace(self, name: str) -> Optional[dict[str, NDArray]]:
+        """Load trace arrays from the on-disk cache, if available."""
+        if self._cache_dir is None:
+            return None
+
+        try:
+            with np.load(self._cache_dir / f"{name}.npz") as cached:
+                if cached["version"] != _TRACE_CACHE_VERSION:
+                    return None
+                # The .RAW file changed since the trace was cached.
+                if not np.array_equal(cached["source"], self._source_stamp()):
+                    return None
+                return {
+                    key: cached[key]
+                    for key in cached.files
+                    if key not in ("version", "source")
+                }
+
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            return None
+
+    def _save_cached_trace(self, name: str, **arrays: NDArray):
+        """Save trace arrays to the on-disk cache, if enabled."""
+        if self._cache_dir is None:
+            return
+
+        tmp_name = None
+        try:
+            self._cache_dir.mkdir(exist_ok=True)
+            # Write to a temporary file first so that the cache is never left
+            # partially written.
+            with tempfile.NamedTemporaryFile(
+                dir=self._cache_dir, suffix=".npz", delete=False
+            ) as f:
+                tmp_name = f.name
+                np.savez(
+                    f,
+                    allow_pickle=False,
+                    version=_TRACE_CACHE_VERSION,
+                    source=self._source_stamp(),
+                    **arrays,
                 )
-            )
-            trace_function_lookup[trace] = func
-        return trace_function_lookup
+            os.replace(tmp_name, self._cache_dir / f"{name}.npz")
+            tmp_name = None
+
+        except OSError as e:
+            logger.warning("Unable to cache the %s trace: %s", name, e)
+
+        finally:
+            if tmp_name is not None:
+                Path(tmp_name).unlink(missing_ok=True)
+
+    def _source_stamp(self) -> NDArray[np.int64]:
+        """Modification time (ns) and size of the .RAW file.
+
+        A .RAW "file" is a directory, so the latest modification time and the
+        total size of the files inside it are used.
+
+        """
+        path = Path(self._path)
+        if path.is_dir():
+            stats = [p.stat() for p in path.iterdir() if p.is_file()]
+        else:
+            stats = [path.stat()]
+
+        return np.array(
+            [
+                max((st.st_mtime_ns for st in stats), default=0),
+                sum(st.st_size for st in stats),
+            ],
+            dtype=np.int64,
+        )
 
     def __get_number_scans(self, function):
         return self._info_reader.GetScansInFunction(function)
@@ -127,12 +371,15 @@ class WatersRawFile(HitIdentifier):
         self,
         channel_id: int = 0,
         scale: bool = True,
+        dtype: Optional[DTypeLike] = None,
     ) -> AnalogTrace:
         """Get AnalogTrace from the LC data file.
 
         There might be different analog traces (e.g., different observed
         wavelengths or baseline compensation methods), those are selected
-        with the `channel_id`.
+        with the `channel_id`. Traces are kept in `analog_traces` by channel,
+        scaling and dtype, so requesting a different `scale` or `dtype`
+        extracts a new trace.
 
         Parameters
         ----------
@@ -142,30 +389,69 @@ class WatersRawFile(HitIdentifier):
         scale, optional
             Scale the absorbance values to 1 A.U., by default True
 
+        dtype, optional
+            Data type of the stored intensities, by default
+            `AnalogTrace.intensities_dtype` (float32).
+
         Returns
         -------
             AnalogTrace containing requested data.
 
         """
-        if channel_id in self.analog_traces:
-            return self.analog_traces[channel_id]
+        dtype = np.dtype(
+            AnalogTrace.intensities_dtype if dtype is None else dtype
+        )
+        key = (channel_id, scale, dtype)
+        if key in self.analog_traces:
+            return self.analog_traces[key]
 
         else:
-            times, intensities = self._analog_reader.ReadChannel(channel_id)
-            description = self._analog_reader.GetChannelDescription(channel_id)
+            cache_name = f"analog_{channel_id}"
+            cached = self._load_cached_trace(cache_name)
+
+            if cached is not None:
+                times = cached["times"]
+                intensities = cached["intensities"]
+                description = str(cached["description"])
+
+            else:
+                times, intensities = self._analog_reader.ReadChannel(
+                    channel_id
+                )
+                times = np.ascontiguousarray(
+                    times, dtype=AnalogTrace.times_dtype
+                )
+                intensities = np.ascontiguousarray(
+                    intensities, dtype=np.float64
+                )
+                description = self._analog_reader.GetChannelDescription(
+                    channel_id
+                ).strip()
+                self._save_cached_trace(
+                    cache_name,
+                    times=times,
+                    intensities=intensities,
+                    description=np.array(description),
+                )
+
+            # The float64 intensities are owned here: AnalogTrace scales them
+            # in place for float64 traces, and otherwise divides them
+            # straight into a buffer of the narrower dtype.
             data = AnalogTrace(
-                times=np.array(times),
-                intensities=np.array(intensities),
-                description=description.strip(),
+                times=times,
+                intensities=intensities,
+                description=description,
                 scale=scale,
+                copy=False,
+                dtype=dtype,
             )
-            self.analog_traces[channel_id] = data
+            self.analog_traces[key] = data
 
             return data
 
     def get_trace(
         self,
-        mode: IonTraceMode,
+        mode: IonTraceMode | int,
     ) -> TICTrace:
         """Get Trace from the MS data file.
 
@@ -173,24 +459,43 @@ class WatersRawFile(HitIdentifier):
         ----------
         mode
             Requested trace, for allowed modes see `IonTraceMode`.
+            Alternatively, the MassLynx ion mode number.
 
         Returns
         -------
             Trace containing requested data.
 
         """
+        mode, ion_mode = self._resolve_ion_mode(mode)
+
         if mode in self.ms_traces:
             return self.ms_traces[mode]
 
         else:
-            function = self._trace_function_lookup[mode]
+            cache_name = f"tic_{mode}"
+            cached = self._load_cached_trace(cache_name)
 
-            times, intensities = self._chromatogram_reader.ReadTIC(function)
+            if cached is not None:
+                times = cached["times"]
+                intensities = cached["intensities"]
+
+            else:
+                function = self._ion_mode_functions[ion_mode]
+                times, intensities = self._chromatogram_reader.ReadTIC(
+                    function
+                )
+                times = np.ascontiguousarray(times, dtype=TICTrace.times_dtype)
+                intensities = np.ascontiguousarray(
+                    intensities, dtype=TICTrace.intensities_dtype
+                )
+                self._save_cached_trace(
+                    cache_name, times=times, intensities=intensities
+                )
 
             data = TICTrace(
                 mode=mode,
-                times=np.array(times),
-                intensities=np.array(intensities),
+                times=times,
+                intensities=intensities,
             )
             self.ms_traces[mode] = data
 
@@ -199,7 +504,7 @@ class WatersRawFile(HitIdentifier):
     def get_mass_spectrum(
         self,
         time: float | timedelta,
-        mode: IonTraceMode,
+        mode: IonTraceMode | int,
         average: int = 0,
     ) -> MassSpectrum:
         """Get MS scan at a specific time.
@@ -209,7 +514,8 @@ class WatersRawFile(HitIdentifier):
         time
             Time (in minutes or as `timedelta`) to extract the scan for.
         mode
-            Mass trace to examine.
+            Mass trace to examine, as an `IonTraceMode` or the MassLynx ion
+            mode number.
         average, optional
             Number of scans around the time to average the MS scans for.
 
@@ -218,24 +524,115 @@ class WatersRawFile(HitIdentifier):
             MassSpectrum at the given time.
 
         """
-
-        function = self._trace_function_lookup[mode]
+        mode, ion_mode = self._resolve_ion_mode(mode)
         trace = self.get_trace(mode=mode)
         idx = trace.get_scan_index(time=time)
 
-        intensities = []
-        for scan in range(idx - average, idx + average + 1):
-            masses, intensity = self._scan_reader.ReadScan(function, scan)
-            intensities.append(intensity)
-        mean_intensity = np.array(intensities).mean(axis=0)
+        # Only the (read-only) arrays are cached, so that every call gets its
+        # own MassSpectrum (e.g., with separate `experimental_hits`).
+        key = (idx, mode, average)
+        if key in self._scan_cache:
+            self._scan_cache.move_to_end(key)
+            masses, mean_intensity = self._scan_cache[key]
+
+        else:
+            function = self._ion_mode_functions[ion_mode]
+
+            masses, intensities = self._read_scan_range(
+                function, idx - average, idx + average + 1
+            )
+            mean_intensity = intensities.mean(axis=0, dtype=np.float64)
+            masses.flags.writeable = False
+            mean_intensity.flags.writeable = False
+
+            self._scan_cache[key] = (masses, mean_intensity)
+            if len(self._scan_cache) > self._scan_cache_size:
+                self._scan_cache.popitem(last=False)
 
         return MassSpectrum(
             masses=masses, intensities=mean_intensity, mode=mode
         )
 
+    def _read_scan_range(
+        self,
+        function: int,
+        start: int,
+        stop: int,
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """Read consecutive MS scans into a single array.
+
+        The scans are written directly into a preallocated C-contiguous
+        buffer, using the mass grid of the first scan as the reference.
+        Scans with a different mass grid are resampled onto it.
+
+        Parameters
+        ----------
+        function
+            Function number of the scans.
+        start, stop
+            Range of scans to read (stop exclusive).
+
+        Returns
+        -------
+            Mass grid and intensities of shape (stop - start, n_masses).
+
+        """
+        read_scan = self._scan_reader.ReadScan
+
+        masses, intensity = read_scan(function, start)
+        masses = self._get_mass_grid(
+            function, np.asarray(masses, dtype=np.float64)
+        )
+        out = np.empty((stop - start, masses.size), dtype=np.float64)
+        out[0] = intensity
+
+        for row in range(1, stop - start):
+            scan_masses, intensity = read_scan(function, start + row)
+            scan_masses = np.asarray(scan_masses, dtype=np.float64)
+            if _same_mass_grid(scan_masses, masses):
+                out[row] = intensity
+            else:
+                out[row] = np.interp(masses, scan_masses, intensity)
+
+        return masses, out
+
+    def clear_scan_cache(self):
+        """Remove all scan data cached by `get_mass_spectrum()`."""
+        self._scan_cache.clear()
+
+    def _get_mass_grid(
+        self,
+        function: int,
+        masses: NDArray[np.float64],
+    ) -> NDArray[np.float64]:
+        """Get a shared mass grid array for the scans of a function.
+
+        Scans within a function almost always share the same mass grid, so
+        the cached grid is returned whenever `masses` match it. This does not
+        save the conversion of the scan masses, but spectra cached by
+        `get_mass_spectrum()` share a single grid array instead of holding
+        one copy each.
+
+        """
+        cached = self._masses_cache.get(function)
+        if cached is not None and _same_mass_grid(masses, cached):
+            return cached
+
+        self._masses_cache[function] = masses
+        return masses
+
+    def invalidate_masses_cache(self):
+        """Remove cached mass grids.
+
+        A cached grid is only reused for scans with identical masses, so this
+        is only needed to free the memory held by the grids.
+
+        """
+        self._masses_cache.clear()
+
     def get_peak_mass_spectrum(
         self,
-        mode: IonTraceMode,
+        mode: IonTraceMode | int,
         peak_idx: int = 0,
         average: int = 0,
     ) -> MassSpectrum:
@@ -244,11 +641,14 @@ class WatersRawFile(HitIdentifier):
         This is an API function for extracting MS scans at a peak in the TIC.
         By default, one scan at the apex of the peak is extracted by one can
         also specify how many scans (left and right from the apex) to average.
+        Peaks already found in the trace are reused, and the spectra are
+        cached by `get_mass_spectrum()`.
 
         Parameters
         ----------
         mode
-            Mass trace to examine.Mass trace to examine.
+            Mass trace to examine, as an `IonTraceMode` or the MassLynx ion
+            mode number.
         peak_idx, optional
             Index of the TracePeak to examine, by default it is the first peak.
         average, optional
@@ -259,12 +659,12 @@ class WatersRawFile(HitIdentifier):
             MassSpectrum at the given TIC peak.
 
         """
+        mode, _ = self._resolve_ion_mode(mode)
         trace = self.get_trace(mode)
         try:
-            if len(trace.peaks) == 0:
-                peak = trace.get_peaks()[peak_idx]
-            else:
-                peak = trace.peaks[peak_idx]
+            # Precomputed peaks are reused; see `TICTrace.invalidate_peaks()`.
+            peaks = trace.peaks if trace.peaks else trace.get_peaks()
+            peak = peaks[peak_idx]
 
         except IndexError:
             raise IndexError("Peak does not exist.")
@@ -272,3 +672,77 @@ class WatersRawFile(HitIdentifier):
         return self.get_mass_spectrum(
             time=peak.time, mode=peak.mode, average=average
         )
+
+
+def load_many(
+    paths: Iterable[PathLike],
+    license_key: Optional[str] = None,
+    modes: Sequence[IonTraceMode] = (),
+    channels: Sequence[int] = (0,),
+    max_workers: Optional[int] = None,
+    scan_cache_size: int = 128,
+    cache_traces: bool = False,
+    scale: bool = True,
+    dtype: Optional[DTypeLike] = None,
+) -> list[WatersRawFile]:
+    """Load multiple .RAW files concurrently.
+
+    The MassLynx SDK calls are blocking I/O, so the files are opened and
+    the requested traces are pre-fetched in a thread pool.
+
+    Parameters
+    ----------
+    paths
+        Paths to the .RAW files.
+    license_key, optional
+        A license key from Waters. If None, the key is read once from a local
+        "license.key" file.
+    modes, optional
+        Ion traces to pre-fetch for each file, by default none.
+    channels, optional
+        Analog channels to pre-fetch for each file, by default (0,).
+    max_workers, optional
+        Maximum number of threads, by default min(8, os.cpu_count()).
+    scan_cache_size, optional
+        Passed to `WatersRawFile`, by default 128.
+    cache_traces, optional
+        Passed to `WatersRawFile`, by default False.
+    scale, optional
+        Passed to `WatersRawFile.get_analog_trace()`, by default True.
+    dtype, optional
+        Passed to `WatersRawFile.get_analog_trace()`, by default None.
+
+    Returns
+    -------
+        WatersRawFiles in the same order as `paths`.
+
+    Raises
+    ------
+    Exception
+        The first error raised while loading any of the files. Loading fails
+        as a whole, so no files are returned in that case.
+
+    """
+    if license_key is None:
+        license_key = _read_license_key()
+
+    if max_workers is None:
+        max_workers = min(8, os.cpu_count() or 1)
+
+    def load(path: PathLike) -> WatersRawFile:
+        raw_file = WatersRawFile(
+            path=path,
+            license_key=license_key,
+            scan_cache_size=scan_cache_size,
+            cache_traces=cache_traces,
+        )
+        for mode in modes:
+            raw_file.get_trace(mode=mode)
+        for channel_id in channels:
+            raw_file.get_analog_trace(
+                channel_id=channel_id, scale=scale, dtype=dtype
+            )
+        return raw_file
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(load, paths))
@@ -2,10 +2,14 @@
 
 from lcms_parser.helpers.helpers import (
     IonTraceMode,
+    TraceMixin,
+    nearest_index,
     normalised,
 )
 
 __all__ = [
     "IonTraceMode",
+    "TraceMixin",
+    "nearest_index",
     "normalised",
 ]
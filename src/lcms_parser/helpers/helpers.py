@@ -1,6 +1,10 @@
 """Module to define common functions and types."""
 
-from typing import Literal
+from datetime import timedelta
+from typing import (
+    Any,
+    Literal,
+)
 
 import numpy as np
 from numpy.typing import (
@@ -26,3 +30,112 @@ def normalised(array: ArrayLike) -> NDArray:
     """
     array = np.array(array)
     return (array - np.min(array)) / (np.max(array) - np.min(array))
+
+
+def nearest_index(
+    array: NDArray[np.float64],
+    values: ArrayLike,
+) -> NDArray[np.intp]:
+    """Get indices of the elements closest to the values in a sorted array.
+
+    Uses a binary search (`numpy.searchsorted()`), so `array` must be sorted
+    in ascending order (e.g., run times). Ties are resolved towards the lower
+    index, consistent with `numpy.argmin()` over absolute differences.
+
+    Parameters
+    ----------
+    array
+        Sorted array to search in.
+    values
+        Value or array of values to find the closest elements for.
+
+    Returns
+    -------
+        Index or array of indices of the closest elements.
+
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if array.size < 2:
+        return np.zeros(values.shape, dtype=np.intp)
+
+    idx = np.clip(np.searchsorted(array, values), 1, array.size - 1)
+    idx -= values - array[idx - 1] <= array[idx] - values
+    return idx
+
+
+class TraceMixin:
+    """Mixin class with scan lookups and peak bookkeeping for traces."""
+
+    times: NDArray[np.float64]
+    peaks: list[Any]
+
+    def invalidate_peaks(self):
+        """Remove previously found peaks.
+
+        Peaks found by `get_peaks()` are accumulated in `peaks` (for TIC
+        traces, these are reused by `WatersRawFile.get_peak_mass_spectrum()`).
+        Invalidate them before detecting peaks again with different
+        parameters.
+
+        """
+        self.peaks = []
+
+    def get_scan_index(
+        self,
+        time: float | timedelta,
+    ) -> int:
+        """Get index of a mass scan at a certain time.
+
+        Dispatches to `get_scan_index_minutes()` or `get_scan_index_td()`
+        depending on the type of `time`.
+
+        Parameters
+        ----------
+        time
+            Time (in minutes or as timedelta) to find the index for.
+
+        Returns
+        -------
+            Array index of the MS scan.
+
+        """
+        if isinstance(time, timedelta):
+            return self.get_scan_index_td(time)
+
+        return self.get_scan_index_minutes(time)
+
+    def get_scan_index_minutes(
+        self,
+        time: float,
+    ) -> int:
+        """Get index of a mass scan at a certain time in minutes.
+
+        Parameters
+        ----------
+        time
+            Time (in minutes) to find the index for.
+
+        Returns
+        -------
+            Array index of the MS scan.
+
+        """
+        return int(nearest_index(self.times, time))
+
+    def get_scan_index_td(
+        self,
+        time: timedelta,
+    ) -> int:
+        """Get index of a mass scan at a certain time given as a timedelta.
+
+        Parameters
+        ----------
+        time
+            Time (as timedelta) to find the index for.
+
+        Returns
+        -------
+            Array index of the MS scan.
+
+        """
+        return self.get_scan_index_minutes(time.total_seconds() / 60)
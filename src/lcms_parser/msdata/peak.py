@@ -5,7 +5,7 @@ from dataclasses import dataclass
 from lcms_parser.helpers.helpers import IonTraceMode
 
 
-@dataclass(kw_only=True)
+@dataclass(frozen=True, kw_only=True, slots=True)
 class MassPeak:
     """A base class containing MS peak information."""
 
@@ -13,7 +13,7 @@ class MassPeak:
     mode: IonTraceMode
 
 
-@dataclass(kw_only=True)
+@dataclass(frozen=True, kw_only=True, slots=True)
 class MassSpectrumResult(MassPeak):
     """A class containing mass spectrometry results."""
 
@@ -21,7 +21,7 @@ class MassSpectrumResult(MassPeak):
     charge: int
 
 
-@dataclass(kw_only=True)
+@dataclass(frozen=True, kw_only=True, slots=True)
 class MassSpectrumExperimentalHit(MassSpectrumResult):
     """A class for keeping track of a mass spectrometry hit."""
 
@@ -2,60 +2,102 @@
 
 from dataclasses import dataclass
 from datetime import timedelta
-from typing import Optional
+from typing import (
+    ClassVar,
+    Optional,
+)
 
 import numpy as np
-from numpy.typing import NDArray
-from scipy.integrate import trapezoid
+from numpy.typing import (
+    DTypeLike,
+    NDArray,
+)
 from scipy.signal import (
     find_peaks,
     peak_widths,
 )
 
+from lcms_parser.helpers._kernels import peak_integrals
+from lcms_parser.helpers.helpers import TraceMixin
+
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AnalogTracePeak:
     """A class containing trace peak information.
 
     Attributes
     ----------
-    time
-        A `timedelta` for the retention time.
+    time_min
+        Retention time (in minutes); `time` gives it as a `timedelta`.
     intensity
         Maximum intensity of the peak.
     integral
         Relative integral of the peak.
     relative_height
         Height from which the integral is calculated.
-    lhs, rhs
-        Indices
+    lhs_min, rhs_min
+        Times (in minutes) of the peak boundaries; `lhs` and `rhs` give them
+        as a `timedelta`.
 
     """
 
-    time: timedelta
+    time_min: float
     intensity: float
     integral: float
     relative_height: float
-    lhs: timedelta
-    rhs: timedelta
+    lhs_min: float
+    rhs_min: float
+
+    @property
+    def time(self) -> timedelta:
+        """A `timedelta` for the retention time."""
+        return timedelta(minutes=self.time_min)
+
+    @property
+    def lhs(self) -> timedelta:
+        """A `timedelta` for the left-hand side of the peak."""
+        return timedelta(minutes=self.lhs_min)
+
+    @property
+    def rhs(self) -> timedelta:
+        """A `timedelta` for the right-hand side of the peak."""
+        return timedelta(minutes=self.rhs_min)
 
 
 @dataclass(init=False)
-class AnalogTrace:
-    """A class containing an analog trace."""
+class AnalogTrace(TraceMixin):
+    """A class containing an analog trace.
+
+    Times and intensities are stored as separate, equal-length C-contiguous
+    arrays (structure of arrays), so that they can be passed directly to
+    vectorised NumPy and SciPy routines. Intensities are stored in single
+    precision by default and only promoted to double precision for peak
+    detection and integration.
+
+    The stored arrays are read-only views, as `get_peaks()` caches data
+    derived from them. To change the data, assign new arrays to `times` or
+    `intensities` (in-place edits of an array passed with `copy=False` are
+    not detected).
+
+    """
+
+    times_dtype: ClassVar[type[np.floating]] = np.float64
+    intensities_dtype: ClassVar[type[np.floating]] = np.float32
 
     times: NDArray[np.float64]
-    intensities: NDArray[np.float64]
+    intensities: NDArray[np.floating]
     description: str
     peaks: list[AnalogTracePeak]
 
     def __init__(
         self,
         times: NDArray[np.float64],
-        intensities: NDArray[np.float64],
+        intensities: NDArray[np.floating],
         description: str,
         scale: bool = True,
         peaks: Optional[list[AnalogTracePeak]] = None,
+        copy: bool = True,
+        dtype: Optional[DTypeLike] = None,
     ):
         """Initialise AnalogTrace.
 
@@ -71,15 +113,42 @@ class AnalogTrace:
             Scale the absorbance values to 1 A.U., by default True
         peaks, optional
             Existing peaks, by default None
+        copy, optional
+            If False, the intensities are scaled in place, which modifies the
+            provided array if it already has the required dtype, by default
+            True.
+        dtype, optional
+            Data type of the stored intensities, by default
+            `AnalogTrace.intensities_dtype` (float32). Scaling is done before
+            the conversion; use float64 for quantitative work.
 
         """
-        self.times = times
+        self.times = np.ascontiguousarray(times, dtype=self.times_dtype).view()
+        self.times.flags.writeable = False
+        dtype = np.dtype(self.intensities_dtype if dtype is None else dtype)
+        intensities = np.asarray(intensities)
         if scale:
-            self.intensities = intensities / intensities.max()
+            max_intensity = float(intensities.max())
+            if (
+                copy
+                or intensities.dtype != dtype
+                or not intensities.flags.c_contiguous
+            ):
+                out = np.empty(intensities.shape, dtype=dtype)
+            else:
+                out = intensities
+            # Divide in the input precision and narrow when storing.
+            np.true_divide(
+                intensities, max_intensity, out=out, casting="same_kind"
+            )
+            intensities = out
         else:
-            self.intensities = intensities
+            intensities = np.ascontiguousarray(intensities, dtype=dtype)
+        self.intensities = intensities.view()
+        self.intensities.flags.writeable = False
         self.description = description
         self.peaks = peaks if peaks is not None else []
+        self._run_window: Optional[tuple] = None
 
     def get_peaks(
         self,
@@ -109,18 +178,14 @@ class AnalogTrace:
 
         Returns
         -------
-            List of Peaks found in the trace.
+            List of Peaks found in the trace. These are also appended to
+            `peaks`.
 
         """
         # % of maximum peak height at which the width is established
         rel_height = kwargs["rel_height"] if "rel_height" in kwargs else 0.95
 
-        # Solvent front and end of run index
-        sf_idx = self.get_scan_index(solvent_front)
-        end_idx = self.get_scan_index(run_end)
-
-        run_times = self.times[sf_idx:end_idx]
-        run_int = self.intensities[sf_idx:end_idx]
+        run_times, run_int = self._get_run_window(solvent_front, run_end)
 
         peak_idx, _ = find_peaks(x=run_int, **kwargs)
         _, peak_height, peak_lhs, peak_rhs = peak_widths(
@@ -128,57 +193,86 @@ class AnalogTrace:
             peaks=peak_idx,
             rel_height=rel_height,
         )
-        peaks = []
-        integrals: list[float] = []
-        total_area = 0.0
-
-        for height, lhs, rhs in zip(peak_height, peak_lhs, peak_rhs):
-            lhs_idx = round(lhs)
-            rhs_idx = round(rhs)
-            area: float = trapezoid(
-                run_int[lhs_idx:rhs_idx] - height,
-                dx=1,
+        lhs_idx = np.rint(peak_lhs).astype(np.intp)
+        rhs_idx = np.rint(peak_rhs).astype(np.intp)
+
+        integrals = peak_integrals(run_int, lhs_idx, rhs_idx, peak_height)
+        if scale_integrals:
+            integrals = integrals / integrals.sum()
+
+        peaks = [
+            AnalogTracePeak(
+                time_min=time_min,
+                intensity=intensity,
+                integral=integral,
+                relative_height=height,
+                lhs_min=lhs_min,
+                rhs_min=rhs_min,
             )
-            integrals.append(area)
-
-            total_area += area
-
-        for x, idx in enumerate(peak_idx):
-            peaks.append(
-                AnalogTracePeak(
-                    time=timedelta(minutes=run_times[idx]),
-                    intensity=run_int[idx],
-                    integral=(
-                        integrals[x] / total_area
-                        if scale_integrals
-                        else integrals[x]
-                    ),
-                    lhs=timedelta(minutes=run_times[round(peak_lhs[x])]),
-                    rhs=timedelta(minutes=run_times[round(peak_rhs[x])]),
-                    relative_height=peak_height[x],
-                )
+            for time_min, intensity, integral, height, lhs_min, rhs_min in zip(
+                run_times[peak_idx].tolist(),
+                run_int[peak_idx].tolist(),
+                integrals.tolist(),
+                peak_height.tolist(),
+                run_times[lhs_idx].tolist(),
+                run_times[rhs_idx].tolist(),
             )
+        ]
 
         self.peaks.extend(peaks)
         return peaks
 
-    def get_scan_index(
+    def _get_run_window(
         self,
-        time: float | timedelta,
-    ) -> int:
-        """Get index of a mass scan at a certain time.
+        solvent_front: float,
+        run_end: float,
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """Get contiguous times and intensities between two times.
+
+        The last window is cached, as the solvent front and run end are
+        usually the same across repeated peak detection. The intensities are
+        promoted to float64 once here, as SciPy's peak finding routines and
+        the integration work in double precision. The float64 copy of the
+        window is kept alive with the trace (until the window changes), on
+        top of the stored intensities.
+
+        The cache is invalidated when `times` or `intensities` are
+        reassigned; the stored arrays are read-only, so they cannot be
+        modified in place.
 
         Parameters
         ----------
-        time
-            Time (in minutes or as timedelta) to find the index for.
+        solvent_front
+            Time (in min) of the solvent front.
+        run_end
+            End (in min) of the actual run.
 
         Returns
         -------
-            Array index of the MS scan.
+            Run times and intensities within the window.
 
         """
-        if isinstance(time, timedelta):
-            time = time / timedelta(minutes=1)
+        # The (read-only) source arrays are compared by identity to catch
+        # reassignment.
+        key = (solvent_front, run_end)
+        if self._run_window is not None:
+            cached_key, times, intensities, window = self._run_window
+            if (
+                cached_key == key
+                and times is self.times
+                and intensities is self.intensities
+            ):
+                return window
 
-        return (np.absolute(self.times - time)).argmin()
+        # Solvent front and end of run index
+        sf_idx = self.get_scan_index_minutes(solvent_front)
+        end_idx = self.get_scan_index_minutes(run_end)
+
+        window = (
+            np.ascontiguousarray(self.times[sf_idx:end_idx]),
+            np.ascontiguousarray(
+                self.intensities[sf_idx:end_idx], dtype=np.float64
+            ),
+        )
+        self._run_window = (key, self.times, self.intensities, window)
+        return window
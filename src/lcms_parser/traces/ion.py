@@ -2,7 +2,10 @@
 
 from dataclasses import dataclass
 from datetime import timedelta
-from typing import Optional
+from typing import (
+    ClassVar,
+    Optional,
+)
 
 import numpy as np
 from numpy.typing import NDArray
@@ -10,11 +13,12 @@ from scipy.signal import find_peaks
 
 from lcms_parser.helpers.helpers import (
     IonTraceMode,
+    TraceMixin,
     normalised,
 )
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class TICTracePeak:
     """A class containing trace peak information."""
 
@@ -24,8 +28,16 @@ class TICTracePeak:
 
 
 @dataclass(init=False)
-class TICTrace:
-    """A class containing a Total Ion Chromatogram trace."""
+class TICTrace(TraceMixin):
+    """A class containing a Total Ion Chromatogram trace.
+
+    Times and intensities are stored as separate, equal-length C-contiguous
+    arrays (structure of arrays).
+
+    """
+
+    times_dtype: ClassVar[type[np.floating]] = np.float64
+    intensities_dtype: ClassVar[type[np.floating]] = np.float64
 
     mode: IonTraceMode
     times: NDArray[np.float64]
@@ -40,8 +52,10 @@ class TICTrace:
         peaks: Optional[list[TICTracePeak]] = None,
     ):
         self.mode = mode
-        self.times = times
-        self.intensities = intensities
+        self.times = np.ascontiguousarray(times, dtype=self.times_dtype)
+        self.intensities = np.ascontiguousarray(
+            intensities, dtype=self.intensities_dtype
+        )
         self.peaks = peaks if peaks is not None else []
 
     def get_peaks(
@@ -59,7 +73,8 @@ class TICTrace:
 
         Returns
         -------
-            List of Peaks found in the trace.
+            List of Peaks found in the trace. These are also appended to
+            `peaks`.
 
         """
         peak_idx, _ = find_peaks(x=normalised(self.intensities), **kwargs)
@@ -70,30 +85,9 @@ class TICTrace:
                 TICTracePeak(
                     mode=self.mode,
                     time=timedelta(minutes=self.times[idx]),
-                    intensity=self.intensities[idx],
+                    intensity=float(self.intensities[idx]),
                 )
             )
 
         self.peaks.extend(peaks)
         return peaks
-
-    def get_scan_index(
-        self,
-        time: float | timedelta,
-    ) -> int:
-        """Get index of a mass scan at a certain time.
-
-        Parameters
-        ----------
-        time
-            Time (in minutes or as timedelta) to find the index for.
-
-        Returns
-        -------
-            Array index of the MS scan.
-
-        """
-        if isinstance(time, timedelta):
-            time = time / timedelta(minutes=1)
-
-        return (np.absolute(self.times - time)).argmin()
@@ -0,0 +1,76 @@
+"""Tests for the peak integration kernels."""
+
+import numpy as np
+import pytest
+from scipy.integrate import trapezoid
+
+from lcms_parser.helpers import _kernels
+
+
+@pytest.fixture
+def peaks():
+    rng = np.random.default_rng(0)
+    run_int = rng.random(2000)
+    lhs_idx = rng.integers(0, run_int.size - 1, 500)
+    # Include empty and single-point peaks.
+    rhs_idx = np.minimum(
+        lhs_idx + rng.integers(0, 50, lhs_idx.size), run_int.size
+    )
+    heights = rng.random(lhs_idx.size) * 0.5
+    return run_int, lhs_idx, rhs_idx, heights
+
+
+def trapezoid_reference(run_int, lhs_idx, rhs_idx, heights):
+    return np.array(
+        [
+            trapezoid(run_int[lhs:rhs] - height, dx=1)
+            for lhs, rhs, height in zip(lhs_idx, rhs_idx, heights)
+        ]
+    )
+
+
+def test_numpy_matches_trapezoid(peaks):
+    np.testing.assert_allclose(
+        _kernels._peak_integrals_numpy(*peaks),
+        trapezoid_reference(*peaks),
+        rtol=1e-9,
+        atol=1e-9,
+    )
+
+
+def test_loop_matches_trapezoid(peaks):
+    np.testing.assert_allclose(
+        _kernels._peak_integrals_loop(*peaks),
+        trapezoid_reference(*peaks),
+        rtol=1e-9,
+        atol=1e-9,
+    )
+
+
+def test_numba_matches_numpy(peaks):
+    pytest.importorskip("numba")
+    np.testing.assert_allclose(
+        _kernels._peak_integrals(*peaks),
+        _kernels._peak_integrals_numpy(*peaks),
+        rtol=1e-9,
+        atol=1e-9,
+    )
+
+
+def test_peak_integrals_dispatch(peaks):
+    run_int, lhs_idx, rhs_idx, heights = peaks
+    few = slice(0, _kernels.NUMBA_THRESHOLD - 1)
+    np.testing.assert_allclose(
+        _kernels.peak_integrals(
+            run_int, lhs_idx[few], rhs_idx[few], heights[few]
+        ),
+        trapezoid_reference(run_int, lhs_idx[few], rhs_idx[few], heights[few]),
+        rtol=1e-9,
+        atol=1e-9,
+    )
+    np.testing.assert_allclose(
+        _kernels.peak_integrals(*peaks),
+        trapezoid_reference(*peaks),
+        rtol=1e-9,
+        atol=1e-9,
+    )